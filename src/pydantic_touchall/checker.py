@@ -1,28 +1,327 @@
 import ast
 import os
+import re
 import sys
-from typing import Dict, List, Tuple, Set, Optional
-from dataclasses import dataclass
+from typing import AbstractSet, Dict, FrozenSet, List, Tuple, Set, Optional
+from dataclasses import dataclass, field
+from enum import IntEnum
 from pathlib import Path
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FieldInfo:
     name: str
     has_default: bool
     is_optional: bool
 
 
+@dataclass(frozen=True, slots=True)
+class ModelSpec:
+    """モデルのフィールド情報（インスタンス化のチェックはビットマスクで行う）"""
+    names: Tuple[str, ...]  # i番目のフィールド名がビットiに対応する
+    required_mask: int  # デフォルト値がなく、Optionalでもないフィールド
+    optional_mask: int  # デフォルト値があるか、Optionalのフィールド
+    all_mask: int
+    # フィールド名 -> ビット位置（namesから導出されるので比較・ハッシュには使わない）
+    field_index: Dict[str, int] = field(compare=False, hash=False, repr=False)
+
+    @classmethod
+    def from_fields(cls, fields: List[FieldInfo]) -> "ModelSpec":
+        """フィールド情報からModelSpecを作る"""
+        field_index: Dict[str, int] = {}
+        required_mask = 0
+        optional_mask = 0
+        for f in fields:
+            bit = 1 << field_index.setdefault(f.name, len(field_index))
+            if f.has_default or f.is_optional:
+                optional_mask |= bit
+            else:
+                required_mask |= bit
+
+        return cls(
+            names=tuple(field_index),
+            required_mask=required_mask,
+            optional_mask=optional_mask,
+            all_mask=(1 << len(field_index)) - 1,
+            field_index=field_index,
+        )
+
+    def mask_of(self, names: AbstractSet[str]) -> int:
+        """フィールド名の集合をビットマスクに変換する（未定義のフィールドは無視）"""
+        mask = 0
+        for name in names:
+            index = self.field_index.get(name)
+            if index is not None:
+                mask |= 1 << index
+        return mask
+
+    def names_of(self, mask: int) -> List[str]:
+        """ビットマスクに対応するフィールド名を返す"""
+        return [name for index, name in enumerate(self.names) if mask >> index & 1]
+
+
+class ErrorKind(IntEnum):
+    """エラーの種類"""
+    MISSING_REQUIRED = 0
+    OPTIONAL_MISSING = 1
+    UNKNOWN_FIELD = 2
+    SYNTAX_ERROR = 3
+
+
+# (行番号, 列, 種類, クラス名（構文エラーの場合はメッセージ）, フィールド名)
+# メッセージの文字列は表示するときまで組み立てない
+ErrorRecord = Tuple[int, int, ErrorKind, str, Tuple[str, ...]]
+
+_MESSAGE_FORMATS: Dict[ErrorKind, str] = {
+    ErrorKind.MISSING_REQUIRED: "Error: {name}の必須フィールドが不足: {fields}",
+    ErrorKind.OPTIONAL_MISSING: "Error: {name}のオプションフィールドが未使用: {fields}",
+    ErrorKind.UNKNOWN_FIELD: "Error: {name}に存在しないフィールド: {fields}",
+    ErrorKind.SYNTAX_ERROR: "Syntax Error: {name}",
+}
+
+
+def format_message(kind: ErrorKind, name: str, fields: Tuple[str, ...]) -> str:
+    """エラーの種類とクラス名、フィールド名からメッセージを組み立てる"""
+    return _MESSAGE_FORMATS[kind].format(name=name, fields=', '.join(sorted(set(fields))))
+
+
+# "# pydantic-touchall: ignore" / "# touchall: ignore-field a, b" 形式のコメント
+# group(1)がNoneでなければignore-fieldで、無視するフィールド名のリスト
+# "ignore-fields"のような書き間違いを全体の無視として扱わないよう、ignoreの後ろに"-"が続く場合はマッチさせない
+_IGNORE_RE = re.compile(r'#\s*(?:pydantic-)?touchall:\s*ignore(?:-field\s+([^#]*)|\b(?!-))')
+
+# 無視するフィールドがない場合に使い回す空集合
+_EMPTY: FrozenSet[str] = frozenset()
+
+
+def _has_project_marker(directory: str) -> bool:
+    """ディレクトリにpyproject.toml or setup.pyがあるか"""
+    return os.path.isfile(os.path.join(directory, 'pyproject.toml')) or \
+        os.path.isfile(os.path.join(directory, 'setup.py'))
+
+
+def _find_project_root(start_dir: str, cache: Dict[str, Optional[str]]) -> Optional[str]:
+    """
+    プロジェクトルート（pyproject.toml or setup.pyがあるディレクトリ）を探す
+
+    結果（見つからなかった場合のNoneを含む）は、途中で辿ったディレクトリ全てについてcacheに記録する
+    """
+    visited = []
+    search_dir = start_dir
+    project_root = None
+    while search_dir != os.path.dirname(search_dir):  # ルートディレクトリに到達するまで
+        if search_dir in cache:
+            project_root = cache[search_dir]
+            break
+        if _has_project_marker(search_dir):
+            project_root = search_dir
+            cache[search_dir] = project_root
+            break
+        visited.append(search_dir)
+        search_dir = os.path.dirname(search_dir)
+
+    for directory in visited:
+        cache[directory] = project_root
+    return project_root
+
+
+def _module_candidates(module_name: str, current_dir: str, project_root: Optional[str]) -> Tuple[str, str]:
+    """
+    モジュールの実体になりうるファイルパス（<path>.py, <path>/__init__.py）を返す
+
+    current_dirは解決元ファイルのディレクトリ、project_rootは絶対importの起点
+    """
+    # 相対importの場合（.で始まる）
+    if module_name.startswith('.'):
+        # .の数だけ親ディレクトリに遡る
+        level = len(module_name) - len(module_name.lstrip('.'))
+        module_parts = module_name.lstrip('.').split('.')
+
+        base_dir = current_dir
+        for _ in range(level - 1):
+            base_dir = os.path.dirname(base_dir)
+
+        file_path = os.path.join(base_dir, *module_parts)
+    else:
+        # 絶対importの場合
+        module_parts = module_name.split('.')
+
+        # プロジェクトルートが見つからない場合は現在のディレクトリから探す
+        file_path = os.path.join(project_root or current_dir, *module_parts)
+
+    # .py ファイル、__init__.py の順に探す
+    return (file_path + '.py', os.path.join(file_path, '__init__.py'))
+
+
+def _find_touchall_lines(source: str) -> Dict[int, str]:
+    """
+    ignoreコメントの可能性がある（"touchall"を含む）行を探す
+
+    ソース全体を行に分割せず、str.findで"touchall"の出現位置だけを辿る
+
+    Returns:
+        {行番号（1始まり）: 行の内容}
+    """
+    touchall_lines: Dict[int, str] = {}
+    lineno = 1
+    line_start = 0
+    pos = source.find('touchall')
+    while pos != -1:
+        lineno += source.count('\n', line_start, pos)
+        line_start = source.rfind('\n', 0, pos) + 1
+        line_end = source.find('\n', pos)
+        if line_end == -1:
+            line_end = len(source)
+        touchall_lines[lineno] = source[line_start:line_end]
+        pos = source.find('touchall', line_end)
+    return touchall_lines
+
+
+def _file_token(path: str) -> Tuple[int, int]:
+    """ファイルの変更検知用トークン（mtime, size）を返す"""
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+class ModelRegistry:
+    """
+    ファイルごとに定義されたモデルのレジストリ
+
+    check_fileの呼び出し間で共有することで、多くのファイルからimportされる
+    モデルも一度だけ収集すればよくなる。ファイルが変更されていれば収集し直す
+    """
+
+    def __init__(self):
+        # realpath -> ((mtime, size), {クラス名: ModelSpec})
+        self._models_by_file: Dict[str, Tuple[Tuple[int, int], Dict[str, ModelSpec]]] = {}
+        # (モジュール名, 解決元ディレクトリ) -> 実体になりうるファイルパス
+        # 解決できなかったimportも記録する。ファイルの有無は使うたびに候補をisfileで確認するので、
+        # 後から作られたモジュールも見つかる
+        self._module_candidates: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        # ディレクトリ -> プロジェクトルート（見つからない場合はNone）
+        self._project_roots: Dict[str, Optional[str]] = {}
+
+    def resolve_module(self, module_name: str, current_dir: str) -> Tuple[Optional[str], Tuple[str, str]]:
+        """
+        モジュール名からファイルパスを解決する
+
+        Returns:
+            (ファイルパス（解決できなければNone）, 実体になりうるファイルパス)
+        """
+        key = (module_name, current_dir)
+        candidates = self._module_candidates.get(key)
+        if candidates is None:
+            project_root = None
+            if not module_name.startswith('.'):
+                project_root = _find_project_root(current_dir, self._project_roots)
+            candidates = _module_candidates(module_name, current_dir, project_root)
+            self._module_candidates[key] = candidates
+
+        for file_path in candidates:
+            if os.path.isfile(file_path):
+                return (file_path, candidates)
+        return (None, candidates)
+
+    def load(self, file_path: str) -> Dict[str, ModelSpec]:
+        """ファイル内で定義されたモデルを返す"""
+        return self.load_with_token(file_path)[1]
+
+    def load_with_token(self, file_path: str) -> Tuple[Tuple[int, int], Dict[str, ModelSpec]]:
+        """
+        ファイル内で定義されたモデルを、読み込む前に取得した(mtime, size)と合わせて返す
+
+        トークンは読み込む前に取るので、読み込み中にファイルが変更されても古い結果が新しい
+        トークンで記録されることはない
+        """
+        key = os.path.realpath(file_path)
+        token = _file_token(key)
+        cached = self._models_by_file.get(key)
+        if cached is not None and cached[0] == token:
+            return cached
+
+        with open(key, 'r', encoding='utf-8') as f:
+            source = f.read()
+
+        # 新しいcheckerを作って、モデル定義のみを収集
+        temp_checker = BaseModelFieldChecker(registry=self)
+        temp_checker.collect_definitions(ast.parse(source, filename=key))
+
+        entry = (token, temp_checker.model_definitions)
+        self._models_by_file[key] = entry
+        return entry
+
+    def clear(self):
+        """収集済みのモデル定義とimportの解決結果を全て破棄する"""
+        self._models_by_file.clear()
+        self._module_candidates.clear()
+        self._project_roots.clear()
+
+
+# registryを指定しない場合に使う、プロセス全体で共有するレジストリ
+_GLOBAL_MODEL_REGISTRY = ModelRegistry()
+
+
+# abspath -> (strict, {依存ファイル: (mtime, size) or None}, エラー)。変更のないファイルを再チェックしないためのキャッシュ
+# 依存ファイルのNoneは「チェック時に存在しなかった」ことを表す
+_FILE_CACHE: Dict[str, Tuple[bool, Dict[str, Optional[Tuple[int, int]]], List[ErrorRecord]]] = {}
+_FILE_CACHE_MAXSIZE = 4096
+
+
+def _stat_token(path: str) -> Optional[Tuple[int, int]]:
+    """ファイルの変更検知用トークンを返す（存在しなければNone）"""
+    try:
+        return _file_token(path)
+    except OSError:
+        return None
+
+
+def _is_cache_valid(deps: Dict[str, Optional[Tuple[int, int]]]) -> bool:
+    """依存ファイルがどれも変更（作成・削除を含む）されていなければTrue"""
+    return all(_stat_token(path) == token for path, token in deps.items())
+
+
+def _store_file_cache(
+    filepath: str,
+    entry: Tuple[bool, Dict[str, Optional[Tuple[int, int]]], List[ErrorRecord]],
+):
+    """チェック結果をキャッシュする（上限を超えたら古いものから捨てる）"""
+    _FILE_CACHE.pop(filepath, None)
+    _FILE_CACHE[filepath] = entry
+    while len(_FILE_CACHE) > _FILE_CACHE_MAXSIZE:
+        del _FILE_CACHE[next(iter(_FILE_CACHE))]
+
+
 class BaseModelFieldChecker(ast.NodeVisitor):
     """BaseModelの全フィールドが設定されているかチェックするlinter"""
 
-    def __init__(self, base_path: str = "", source_lines: Optional[List[str]] = None):
-        self.model_definitions: Dict[str, List[FieldInfo]] = {}
-        self.errors: List[Tuple[int, int, str]] = []
+    def __init__(
+        self,
+        base_path: str = "",
+        source_lines: Optional[List[str]] = None,
+        touchall_lines: Optional[Dict[int, str]] = None,
+        registry: Optional[ModelRegistry] = None,
+    ):
+        self.model_definitions: Dict[str, ModelSpec] = {}
+        self.errors: List[ErrorRecord] = []
         self.base_path = base_path or os.getcwd()
         self.processed_files: Set[str] = set()
+        # 読み込んだimport先のファイル -> 読み込む前の(mtime, size)
+        self.dependency_tokens: Dict[str, Optional[Tuple[int, int]]] = {}
+        # 解決できなかったimportの候補ファイル。後から作られた場合にキャッシュを無効にするために記録する
+        self.unresolved_files: Set[str] = set()
         self.imported_models: Dict[str, str] = {}  # model_name -> module_path
+        self.registry = registry or _GLOBAL_MODEL_REGISTRY
         self.source_lines = source_lines or []
+        # "touchall"を含む行（行番号 -> 内容）。ignoreコメントの判定はこの行だけを見る
+        if touchall_lines is None:
+            touchall_lines = _find_touchall_lines('\n'.join(self.source_lines))
+        self.touchall_lines = touchall_lines
+        # ノードの型 -> 処理メソッド（NodeVisitorのgetattrによるディスパッチの代わり）
+        self._definition_dispatch = {
+            ast.Import: self.visit_Import,
+            ast.ImportFrom: self.visit_ImportFrom,
+            ast.ClassDef: self.visit_ClassDef,
+        }
 
     def visit_Import(self, node: ast.Import):
         """import文を処理"""
@@ -31,7 +330,6 @@ class BaseModelFieldChecker(ast.NodeVisitor):
             # import時のエイリアスがあればそれを使用、なければモジュール名をそのまま使用
             imported_as = alias.asname or module_name
             # モジュール全体のimportは対応しない（from X import Yのみ対応）
-        self.generic_visit(node)
 
     def visit_ImportFrom(self, node: ast.ImportFrom):
         """from X import Y文を処理"""
@@ -47,8 +345,6 @@ class BaseModelFieldChecker(ast.NodeVisitor):
             model_name = alias.asname or alias.name
             self.imported_models[model_name] = module_path
 
-        self.generic_visit(node)
-
     def visit_ClassDef(self, node: ast.ClassDef):
         """BaseModelを継承したクラスの定義を収集"""
         # BaseModelを継承しているか確認
@@ -60,9 +356,82 @@ class BaseModelFieldChecker(ast.NodeVisitor):
 
         if is_base_model:
             fields = self._extract_fields(node)
-            self.model_definitions[node.name] = fields
+            self.model_definitions[node.name] = ModelSpec.from_fields(fields)
+
+    def visit(self, node: ast.AST):
+        """
+        NodeVisitorとしてのエントリポイント
 
-        self.generic_visit(node)
+        visit_*は個々のノードを処理するだけで子ノードを辿らないので、checkで木全体を処理する
+        """
+        self.check(node)
+
+    def collect_definitions(self, tree: ast.AST):
+        """1パス目: import文とBaseModelの定義だけを収集"""
+        # ループ内で参照するものはローカル変数に束縛しておく
+        get_handler = self._definition_dispatch.get
+        iter_child_nodes = ast.iter_child_nodes
+        _isinstance = isinstance
+        _expr = ast.expr
+        _ClassDef = ast.ClassDef
+
+        # 再帰せず、スタックで文（stmt）だけをソース順に辿る
+        stack = [tree]
+        pop = stack.pop
+        extend = stack.extend
+        while stack:
+            node = pop()
+            node_type = type(node)
+            handler = get_handler(node_type)
+            if handler is not None:
+                handler(node)
+                # クラス本体（メソッドやif文の中を含む）にもクラス定義がありうるので、続けて辿る
+                if node_type is not _ClassDef:
+                    continue
+
+            # import文やクラス定義は文（stmt）の中にしか現れないので、exprは辿らない
+            children = [child for child in iter_child_nodes(node) if not _isinstance(child, _expr)]
+            children.reverse()
+            extend(children)
+
+    def check(self, tree: ast.AST):
+        """モデル定義を収集してから、全てのインスタンス化をチェック"""
+        self.collect_definitions(tree)
+
+        # importされたモデルの定義はCallごとではなく、ここでモジュール単位にまとめて読み込む
+        if hasattr(self, 'current_file'):
+            names_by_module: Dict[str, Set[str]] = {}
+            for model_name, module_path in self.imported_models.items():
+                # ファイル内で定義済みの名前は読み込まない
+                if model_name not in self.model_definitions:
+                    names_by_module.setdefault(module_path, set()).add(model_name)
+
+            for module_path, model_names in names_by_module.items():
+                self._load_imported_module(module_path, model_names, self.current_file)
+
+        # 2パス目: Callノードだけをチェック
+        model_definitions = self.model_definitions
+        check_instantiation = self._check_instantiation
+        _type = type
+        _Call = ast.Call
+        _Name = ast.Name
+        _Attribute = ast.Attribute
+        for node in ast.walk(tree):
+            if _type(node) is not _Call:
+                continue
+
+            func = node.func
+            func_type = _type(func)
+            if func_type is _Name:
+                class_name = func.id
+            elif func_type is _Attribute:
+                class_name = func.attr
+            else:
+                continue
+
+            # 定義済みのBaseModelクラスか確認
+            if class_name in model_definitions:
+                check_instantiation(node, class_name)
 
     def _extract_fields(self, class_node: ast.ClassDef) -> List[FieldInfo]:
         """クラスからフィールド情報を抽出"""
@@ -93,240 +462,223 @@ class BaseModelFieldChecker(ast.NodeVisitor):
                 return annotation.value.attr == 'Optional'
         return False
 
-    def _resolve_module_path(self, module_name: str, current_file: str) -> Optional[str]:
-        """モジュール名からファイルパスを解決"""
-        # 相対importの場合（.で始まる）
-        if module_name.startswith('.'):
-            current_dir = os.path.dirname(current_file)
-            # .の数だけ親ディレクトリに遡る
-            level = len(module_name) - len(module_name.lstrip('.'))
-            module_parts = module_name.lstrip('.').split('.')
-
-            base_dir = current_dir
-            for _ in range(level - 1):
-                base_dir = os.path.dirname(base_dir)
-
-            file_path = os.path.join(base_dir, *module_parts)
-        else:
-            # 絶対importの場合
-            # まず現在のファイルからの相対パスで解決を試みる
-            current_dir = os.path.dirname(current_file)
-            module_parts = module_name.split('.')
-
-            # プロジェクトルートを探す（pyproject.toml or setup.pyがあるディレクトリ）
-            search_dir = current_dir
-            project_root = None
-            while search_dir != os.path.dirname(search_dir):  # ルートディレクトリに到達するまで
-                if os.path.exists(os.path.join(search_dir, 'pyproject.toml')) or \
-                   os.path.exists(os.path.join(search_dir, 'setup.py')):
-                    project_root = search_dir
-                    break
-                search_dir = os.path.dirname(search_dir)
-
-            if not project_root:
-                # プロジェクトルートが見つからない場合は現在のディレクトリから探す
-                project_root = current_dir
-
-            file_path = os.path.join(project_root, *module_parts)
-
-        # .py ファイルとして存在するか確認
-        if os.path.exists(file_path + '.py'):
-            return file_path + '.py'
-
-        # __init__.py として存在するか確認
-        init_path = os.path.join(file_path, '__init__.py')
-        if os.path.exists(init_path):
-            return init_path
+    def _resolve_module_path(self, module_name: str, current_file: str) -> Tuple[Optional[str], Tuple[str, str]]:
+        """モジュール名からファイルパスを解決（解決に使った候補のファイルパスも返す）"""
+        # 解決結果は探索を始めるディレクトリだけに依存するので、ディレクトリ単位でキャッシュする
+        return self.registry.resolve_module(module_name, os.path.dirname(current_file))
 
-        return None
-
-    def _load_imported_model(self, model_name: str, current_file: str):
-        """importされたモデルの定義を読み込む"""
-        if model_name in self.model_definitions:
-            # すでに定義済み
-            return
+    def _load_imported_module(self, module_path: str, model_names: Set[str], current_file: str):
+        """importしたモジュールのモデル定義を読み込む（model_namesはそのモジュールからimportした名前）"""
+        file_path, candidates = self._resolve_module_path(module_path, current_file)
 
-        if model_name not in self.imported_models:
-            # importされていない
+        if not file_path:
+            self.unresolved_files.update(candidates)
             return
 
-        module_path = self.imported_models[model_name]
-        file_path = self._resolve_module_path(module_path, current_file)
-
-        if not file_path or file_path in self.processed_files:
+        if file_path in self.processed_files:
             return
 
         self.processed_files.add(file_path)
 
+        # 読み込みに失敗した場合に備えて、読み込む前のトークンを取っておく
+        token = _stat_token(file_path)
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                source = f.read()
-
-            tree = ast.parse(source, filename=file_path)
-
-            # 新しいcheckerを作って、モデル定義のみを収集
-            temp_checker = BaseModelFieldChecker(self.base_path)
-            temp_checker.processed_files = self.processed_files  # 処理済みファイルを共有
-            temp_checker.visit(tree)
-
-            # モデル定義をマージ
-            for name, fields in temp_checker.model_definitions.items():
-                if name == model_name or name not in self.model_definitions:
-                    self.model_definitions[name] = fields
-
+            token, models = self.registry.load_with_token(file_path)
         except (OSError, SyntaxError):
             # ファイルが読めない、またはパースエラーの場合は無視
-            pass
-
-    def visit_Call(self, node: ast.Call):
-        """モデルのインスタンス化をチェック"""
-        # クラス名を取得
-        class_name = None
-        if isinstance(node.func, ast.Name):
-            class_name = node.func.id
-        elif isinstance(node.func, ast.Attribute):
-            class_name = node.func.attr
-
-        if class_name:
-            # importされたモデルの定義を読み込む
-            if hasattr(self, 'current_file'):
-                self._load_imported_model(class_name, self.current_file)
+            self.dependency_tokens[file_path] = token
+            return
 
-            # 定義済みのBaseModelクラスか確認
-            if class_name in self.model_definitions:
-                self._check_instantiation(node, class_name)
+        self.dependency_tokens[file_path] = token
 
-        self.generic_visit(node)
+        # モデル定義をマージ
+        for name, spec in models.items():
+            if name in model_names or name not in self.model_definitions:
+                self.model_definitions[name] = spec
 
-    def _check_ignore_comment(self, lineno: int) -> Tuple[bool, Set[str]]:
+    def _check_ignore_comment(self, lineno: int) -> Tuple[bool, AbstractSet[str]]:
         """
         指定された行のignoreコメントをチェック
 
         Returns:
             (全体を無視するか, 無視するフィールド名のセット)
         """
-        if not self.source_lines or lineno <= 0 or lineno > len(self.source_lines):
-            return (False, set())
+        touchall_lines = self.touchall_lines
+
+        # ファイル内に"touchall"が一度も出てこなければ、ignoreコメントはない
+        if not touchall_lines:
+            return (False, _EMPTY)
 
         # 該当する行とその前の行をチェック（コメントが前の行にある場合もある）
-        lines_to_check = []
-        if lineno > 0:
-            lines_to_check.append(self.source_lines[lineno - 1])
-        if lineno > 1:
-            lines_to_check.append(self.source_lines[lineno - 2])
-
-        for line in lines_to_check:
-            # pydantic-touchall: ignore-field field1,field2 形式を先にチェック
-            # (ignore より先にチェックしないと、ignore-field が ignore にマッチしてしまう)
-            if '# pydantic-touchall: ignore-field' in line or '# touchall: ignore-field' in line:
-                # コメント部分を抽出
-                comment_part = line.split('#', 1)[1]
-                if 'ignore-field' in comment_part:
-                    # フィールド名を抽出
-                    field_part = comment_part.split('ignore-field', 1)[1].strip()
-                    ignored_fields = {f.strip() for f in field_part.split(',') if f.strip()}
-                    return (False, ignored_fields)
-
-            # pydantic-touchall: ignore コメントをチェック
-            elif '# pydantic-touchall: ignore' in line or '# touchall: ignore' in line:
-                return (True, set())
-
-        return (False, set())
+        for line_no in (lineno, lineno - 1):
+            line = touchall_lines.get(line_no)
+            if line is None:
+                # "touchall"を含まない行にignoreコメントはない
+                continue
+
+            match = _IGNORE_RE.search(line)
+            if match is None:
+                continue
+
+            # pydantic-touchall: ignore-field field1,field2 形式
+            if match.group(1) is not None:
+                ignored_fields = frozenset(f.strip() for f in match.group(1).split(',') if f.strip())
+                return (False, ignored_fields)
+
+            # pydantic-touchall: ignore 形式
+            return (True, _EMPTY)
+
+        return (False, _EMPTY)
 
     def _check_instantiation(self, node: ast.Call, class_name: str):
         """インスタンス化時のフィールドチェック"""
+        lineno = node.lineno
+        keywords = node.keywords
+
         # ignoreコメントをチェック
-        ignore_all, ignored_fields = self._check_ignore_comment(node.lineno)
+        ignore_all, ignored_fields = self._check_ignore_comment(lineno)
         if ignore_all:
             return
 
-        fields = self.model_definitions[class_name]
+        # **kwargsがある場合は、モデル定義を引く前にスキップ
+        if any(keyword.arg is None for keyword in keywords):
+            return
 
-        # 必須フィールド（デフォルト値がなく、Optionalでもない）
-        required_fields = {
-            f.name for f in fields
-            if not f.has_default and not f.is_optional
-        }
+        spec = self.model_definitions[class_name]
 
-        # 全フィールド
-        all_fields = {f.name for f in fields}
+        # 渡されているキーワード引数をビットマスクにする（定義にないものは別に集める）
+        get_index = spec.field_index.get
+        provided_mask = 0
+        unknown_fields = []
+        for keyword in keywords:
+            index = get_index(keyword.arg)
+            if index is None:
+                unknown_fields.append(keyword.arg)
+            else:
+                provided_mask |= 1 << index
 
-        # 渡されている引数を収集
-        provided_fields = set()
-        has_kwargs = False
+        # 未使用のフィールド（無視されたフィールドを除外）
+        missing_mask = spec.all_mask & ~provided_mask
+        if ignored_fields:
+            missing_mask &= ~spec.mask_of(ignored_fields)
 
-        # キーワード引数
-        for keyword in node.keywords:
-            if keyword.arg is None:  # **kwargs
-                has_kwargs = True
-            else:
-                provided_fields.add(keyword.arg)
+        missing_required = missing_mask & spec.required_mask
+        optional_missing = missing_mask & spec.optional_mask
 
-        # **kwargsがある場合はスキップ
-        if has_kwargs:
+        # 報告するものがなければ、メッセージを組み立てずに終了
+        if not (missing_required or optional_missing or unknown_fields):
             return
 
-        # 必須フィールドのチェック（無視されたフィールドを除外）
-        missing_required = (required_fields - provided_fields) - ignored_fields
+        errors_append = self.errors.append
+        col = node.col_offset
+
+        # 必須フィールドのチェック
         if missing_required:
-            self.errors.append((
-                node.lineno,
-                node.col_offset,
-                f"Error: {class_name}の必須フィールドが不足: {', '.join(sorted(missing_required))}"
+            errors_append((
+                lineno,
+                col,
+                ErrorKind.MISSING_REQUIRED,
+                class_name,
+                tuple(spec.names_of(missing_required)),
             ))
 
         # 全フィールドのチェック（より厳密なチェック）
-        missing_all = (all_fields - provided_fields) - ignored_fields
-        if missing_all:
-            optional_missing = [
-                f.name for f in fields
-                if f.name in missing_all and (f.has_default or f.is_optional)
-            ]
-            if optional_missing:
-                self.errors.append((
-                    node.lineno,
-                    node.col_offset,
-                    f"Error: {class_name}のオプションフィールドが未使用: {', '.join(sorted(optional_missing))}"
-                ))
+        if optional_missing:
+            errors_append((
+                lineno,
+                col,
+                ErrorKind.OPTIONAL_MISSING,
+                class_name,
+                tuple(spec.names_of(optional_missing)),
+            ))
 
         # 未定義のフィールド
-        unknown_fields = provided_fields - all_fields
         if unknown_fields:
-            self.errors.append((
-                node.lineno,
-                node.col_offset,
-                f"Error: {class_name}に存在しないフィールド: {', '.join(sorted(unknown_fields))}"
+            errors_append((
+                lineno,
+                col,
+                ErrorKind.UNKNOWN_FIELD,
+                class_name,
+                tuple(unknown_fields),
             ))
 
 
-def check_file(filepath: str, strict: bool = True) -> List[Tuple[int, int, str]]:
+def collect_errors(
+    filepath: str,
+    strict: bool = True,
+    registry: Optional[ModelRegistry] = None,
+) -> List[ErrorRecord]:
     """
-    ファイルをチェック
+    ファイルをチェックし、メッセージを組み立てる前のエラーを返す
 
     Args:
         filepath: チェックするPythonファイル
         strict: Trueの場合、オプショナルフィールドも警告対象
+        registry: importしたモデルの定義を共有するレジストリ（省略時はプロセス全体で共有）
 
     Returns:
-        エラーと警告のリスト
+        (行番号, 列, 種類, クラス名, フィールド名) のリスト。表示にはformat_messageを使う
     """
     # 絶対パスに変換
     filepath = os.path.abspath(filepath)
 
+    # 本体も依存ファイルも変更されていなければ、前回の結果を返す
+    cached = _FILE_CACHE.get(filepath)
+    if cached is not None and cached[0] == strict and _is_cache_valid(cached[1]):
+        # 最近使ったものとして末尾に移す
+        _store_file_cache(filepath, cached)
+        return list(cached[2])
+
+    token = _file_token(filepath)
+
     with open(filepath, 'r', encoding='utf-8') as f:
         source = f.read()
 
     try:
         tree = ast.parse(source, filename=filepath)
     except SyntaxError as e:
-        return [(e.lineno or 0, e.offset or 0, f"Syntax Error: {e.msg}")]
+        errors: List[ErrorRecord] = [(e.lineno or 0, e.offset or 0, ErrorKind.SYNTAX_ERROR, e.msg, ())]
+        _store_file_cache(filepath, (strict, {filepath: token}, errors))
+        return list(errors)
 
-    # ソースコードを行ごとに分割
-    source_lines = source.splitlines()
+    # ignoreコメントの判定に必要な行だけを取り出す（ソース全体は行に分割しない）
+    touchall_lines = _find_touchall_lines(source) if 'touchall' in source else {}
 
-    checker = BaseModelFieldChecker(source_lines=source_lines)
+    checker = BaseModelFieldChecker(touchall_lines=touchall_lines, registry=registry)
     checker.current_file = filepath
     checker.processed_files.add(filepath)
-    checker.visit(tree)
+    checker.check(tree)
+
+    # ast.walkは幅優先で辿るので、ソース上の位置順に並べ直す
+    checker.errors.sort(key=lambda err: (err[0], err[1]))
+
+    # 読み込んだimport先のファイル（読み込む前のトークン）と、解決できなかったimportの候補
+    # （存在しなかったのでNone）も依存として記録する
+    deps: Dict[str, Optional[Tuple[int, int]]] = {path: None for path in checker.unresolved_files}
+    deps.update(checker.dependency_tokens)
+    deps[filepath] = token
+    _store_file_cache(filepath, (strict, deps, checker.errors))
+
+    return list(checker.errors)
+
+
+def check_file(
+    filepath: str,
+    strict: bool = True,
+    registry: Optional[ModelRegistry] = None,
+) -> List[Tuple[int, int, str]]:
+    """
+    ファイルをチェック
 
-    return checker.errors
+    Args:
+        filepath: チェックするPythonファイル
+        strict: Trueの場合、オプショナルフィールドも警告対象
+        registry: importしたモデルの定義を共有するレジストリ（省略時はプロセス全体で共有）
+
+    Returns:
+        エラーと警告のリスト
+    """
+    return [
+        (lineno, col, format_message(kind, name, fields))
+        for lineno, col, kind, name, fields in collect_errors(filepath, strict, registry)
+    ]
@@ -1,11 +1,26 @@
 """コマンドラインインターフェース"""
+import os
 import sys
 import argparse
+from contextlib import ExitStack
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
-from .checker import check_file
+from .checker import ErrorKind, collect_errors, format_message
 
 
-def main():
+def _positive_int(value: str) -> int:
+    """1以上の整数だけを受け付けるargparse用の型"""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"1以上の整数を指定してください: {value}")
+    return number
+
+
+def main(argv=None):
     """コマンドラインツールとして実行"""
     parser = argparse.ArgumentParser(
         description='PydanticのBaseModelフィールドチェックlinter'
@@ -16,20 +31,39 @@ def main():
         action='store_true',
         help='オプショナルフィールドも警告対象にする'
     )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=_positive_int,
+        default=None,
+        help='並列にチェックするプロセス数（デフォルト: CPU数とファイル数の小さい方）'
+    )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     total_errors = 0
 
-    for filepath in args.files:
-        errors = check_file(filepath, strict=args.strict)
+    jobs = args.jobs or min(len(args.files), os.cpu_count() or 1)
+
+    check = partial(collect_errors, strict=args.strict)
+
+    with ExitStack() as stack:
+        if jobs > 1 and len(args.files) > 2:
+            # ファイルごとのチェックは独立しているので、プロセスを分けて並列に実行
+            executor = stack.enter_context(ProcessPoolExecutor(max_workers=jobs))
+            results = executor.map(check, args.files)
+        else:
+            # ファイルが少ない場合はプロセス起動のコストの方が大きいので逐次実行
+            results = map(check, args.files)
 
-        if errors:
-            print(f"\n{filepath}:")
-            for lineno, col, message in errors:
-                print(f"  {lineno}:{col} - {message}")
-                if message.startswith("Error:"):
-                    total_errors += 1
+        # 結果は終わったものから順に表示し、途中で例外が起きてもそれまでの出力は残す
+        for filepath, errors in zip(args.files, results):
+            if errors:
+                print(f"\n{filepath}:")
+                for lineno, col, kind, name, fields in errors:
+                    # メッセージは表示するときに組み立てる
+                    print(f"  {lineno}:{col} - {format_message(kind, name, fields)}")
+                    if kind != ErrorKind.SYNTAX_ERROR:
+                        total_errors += 1
 
     if total_errors > 0:
         print(f"\n合計 {total_errors} 個のエラーが見つかりました。")
@@ -1,8 +1,9 @@
 """チェッカーのテスト"""
+import ast
 import tempfile
 from pathlib import Path
 import pytest
-from pydantic_touchall.checker import check_file
+from pydantic_touchall.checker import BaseModelFieldChecker, ModelRegistry, check_file
 
 
 def test_missing_required_field():
@@ -294,3 +295,282 @@ user = User(
         assert len(errors) == 0
 
         Path(f.name).unlink()
+
+
+def test_imported_model():
+    """別ファイルからimportしたモデルのテスト"""
+    models_code = '''
+from pydantic import BaseModel
+
+class User(BaseModel):
+    name: str
+    email: str
+    age: int
+'''
+    code = '''
+from models import User
+
+# ageが不足
+user = User(
+    name="Alice",
+    email="alice@example.com",
+)
+'''
+    with tempfile.TemporaryDirectory() as tmpdir:
+        Path(tmpdir, 'pyproject.toml').write_text('')
+        Path(tmpdir, 'models.py').write_text(models_code)
+        main_path = Path(tmpdir, 'main.py')
+        main_path.write_text(code)
+
+        errors = check_file(str(main_path))
+
+        # importしたモデルの必須フィールド不足が検出される
+        assert len(errors) == 1
+        assert "age" in errors[0][2]
+        assert "必須フィールドが不足" in errors[0][2]
+
+
+def test_imported_model_reloaded_after_change():
+    """importしたモデルのファイルが変更された場合に再読み込みされるテスト"""
+    code = '''
+from models import User
+
+user = User(
+    name="Alice",
+)
+'''
+    with tempfile.TemporaryDirectory() as tmpdir:
+        Path(tmpdir, 'pyproject.toml').write_text('')
+        models_path = Path(tmpdir, 'models.py')
+        models_path.write_text('from pydantic import BaseModel\n\nclass User(BaseModel):\n    name: str\n')
+        main_path = Path(tmpdir, 'main.py')
+        main_path.write_text(code)
+
+        assert check_file(str(main_path)) == []
+
+        # フィールドを追加すると、キャッシュではなく新しい定義でチェックされる
+        models_path.write_text(
+            'from pydantic import BaseModel\n\nclass User(BaseModel):\n    name: str\n    email: str\n'
+        )
+        errors = check_file(str(main_path))
+
+        assert len(errors) == 1
+        assert "email" in errors[0][2]
+
+
+def test_recheck_after_file_change():
+    """チェック済みのファイルが変更された場合に再チェックされるテスト"""
+    code = '''
+from pydantic import BaseModel
+
+class User(BaseModel):
+    name: str
+
+user = User(name="Alice")
+'''
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
+        f.write(code)
+        f.flush()
+
+        assert check_file(f.name) == []
+        # 変更がなければ同じ結果になる
+        assert check_file(f.name) == []
+
+        # フィールドを追加すると、新しい内容でチェックされる
+        Path(f.name).write_text(code.replace("    name: str\n", "    name: str\n    age: int\n"))
+        errors = check_file(f.name)
+
+        assert len(errors) == 1
+        assert "age" in errors[0][2]
+
+        Path(f.name).unlink()
+
+
+def test_nested_model():
+    """クラス内にネストしたモデルのテスト"""
+    code = '''
+from pydantic import BaseModel
+
+class Outer(BaseModel):
+    class Inner(BaseModel):
+        value: int
+
+    inner: Inner
+
+# valueが不足
+inner = Outer.Inner()
+'''
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
+        f.write(code)
+        f.flush()
+
+        errors = check_file(f.name)
+
+        # ネストしたモデルの必須フィールド不足が検出される
+        assert len(errors) == 1
+        assert "Innerの必須フィールドが不足: value" in errors[0][2]
+
+        Path(f.name).unlink()
+
+
+def test_model_defined_in_method_and_if_block():
+    """メソッド内やクラス本体のif文の中で定義したモデルのテスト"""
+    code = '''
+from pydantic import BaseModel
+
+class Service:
+    def run(self):
+        class In(BaseModel):
+            value: int
+
+        return In()
+
+class Config:
+    if True:
+        class Other(BaseModel):
+            name: str
+
+other = Config.Other()
+'''
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
+        f.write(code)
+        f.flush()
+
+        errors = check_file(f.name)
+
+        # どちらのモデルも収集され、必須フィールド不足が検出される
+        assert len(errors) == 2
+        assert any("Inの必須フィールドが不足: value" in err[2] for err in errors)
+        assert any("Otherの必須フィールドが不足: name" in err[2] for err in errors)
+
+        Path(f.name).unlink()
+
+
+def test_ignore_field_comment_without_spaces():
+    """空白を省略したignore-fieldコメントのテスト"""
+    code = '''
+from pydantic import BaseModel
+
+class User(BaseModel):
+    name: str
+    email: str
+    age: int
+
+user = User(  #touchall:ignore-field age,email
+    name="Alice",
+)
+'''
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
+        f.write(code)
+        f.flush()
+
+        errors = check_file(f.name)
+
+        # ageとemailは無視される
+        assert len(errors) == 0
+
+        Path(f.name).unlink()
+
+
+def test_shared_registry():
+    """複数ファイルで同じレジストリを共有した場合のテスト"""
+    models_code = '''
+from pydantic import BaseModel
+
+class User(BaseModel):
+    name: str
+    age: int
+'''
+    code = '''
+from models import User
+
+# ageが不足
+user = User(name="Alice")
+'''
+    with tempfile.TemporaryDirectory() as tmpdir:
+        Path(tmpdir, 'pyproject.toml').write_text('')
+        Path(tmpdir, 'models.py').write_text(models_code)
+        Path(tmpdir, 'a.py').write_text(code)
+        Path(tmpdir, 'b.py').write_text(code)
+
+        registry = ModelRegistry()
+        errors_a = check_file(str(Path(tmpdir, 'a.py')), registry=registry)
+        errors_b = check_file(str(Path(tmpdir, 'b.py')), registry=registry)
+
+        # どちらのファイルでもimportしたモデルでチェックされる
+        assert len(errors_a) == 1 and "age" in errors_a[0][2]
+        assert len(errors_b) == 1 and "age" in errors_b[0][2]
+
+
+def test_imported_module_created_later():
+    """import先のファイルが後から作られた場合のテスト"""
+    code = '''
+from models import User
+
+# ageが不足
+user = User(name="Alice")
+'''
+    with tempfile.TemporaryDirectory() as tmpdir:
+        Path(tmpdir, 'pyproject.toml').write_text('')
+        main_path = Path(tmpdir, 'main.py')
+        main_path.write_text(code)
+
+        # models.pyがまだないので、Userはチェックされない
+        assert check_file(str(main_path)) == []
+
+        Path(tmpdir, 'models.py').write_text(
+            'from pydantic import BaseModel\n\nclass User(BaseModel):\n    name: str\n    age: int\n'
+        )
+        errors = check_file(str(main_path))
+
+        # main.pyが変更されていなくても、作られたmodels.pyの定義でチェックされる
+        assert len(errors) == 1
+        assert "age" in errors[0][2]
+
+
+def test_visit_checks_whole_tree():
+    """NodeVisitorとしてvisitを呼んだ場合も、ネストした呼び出しをチェックするテスト"""
+    code = '''
+from pydantic import BaseModel
+
+class A(BaseModel):
+    x: int
+
+print(A())
+
+class Factory:
+    def make(self):
+        return A()
+'''
+    checker = BaseModelFieldChecker()
+    checker.visit(ast.parse(code))
+
+    # print()の引数とメソッド内のA()の両方が検出される
+    assert len(checker.errors) == 2
+
+
+def test_misspelled_ignore_field_comment():
+    """ignore-fieldを書き間違えた場合に、全体が無視されないことのテスト"""
+    code = '''
+from pydantic import BaseModel
+
+class User(BaseModel):
+    name: str
+    x: int
+    y: int
+
+user = User(  # touchall: ignore-fields x
+    name="Alice",
+)
+'''
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
+        f.write(code)
+        f.flush()
+
+        errors = check_file(f.name)
+
+        # 書き間違いのコメントは無視され、xとyの不足が検出される
+        assert len(errors) == 1
+        assert "x, y" in errors[0][2]
+
+        Path(f.name).unlink()
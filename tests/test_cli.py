@@ -0,0 +1,45 @@
+"""CLIのテスト"""
+import tempfile
+from pathlib import Path
+import pytest
+from pydantic_touchall.cli import main
+
+
+MODEL_CODE = '''
+from pydantic import BaseModel
+
+class User(BaseModel):
+    name: str
+    age: int
+'''
+
+
+def test_parallel_jobs_report_in_file_order(capsys):
+    """--jobsで並列に実行してもファイルの順に結果が表示されるテスト"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        files = []
+        for i in range(3):
+            path = Path(tmpdir) / f"mod{i}.py"
+            # 偶数番目のファイルだけageが不足
+            call = 'User(name="Alice")' if i % 2 == 0 else 'User(name="Alice", age=1)'
+            path.write_text(MODEL_CODE + f"\nuser = {call}\n")
+            files.append(str(path))
+
+        with pytest.raises(SystemExit) as exc_info:
+            main(['--jobs', '2'] + files)
+
+        assert exc_info.value.code == 1
+        out = capsys.readouterr().out
+        assert files[1] not in out
+        assert out.index(files[0]) < out.index(files[2])
+        assert "合計 2 個のエラーが見つかりました。" in out
+
+
+@pytest.mark.parametrize('jobs', ['0', '-1', 'abc'])
+def test_jobs_must_be_positive(jobs, capsys):
+    """--jobsに1未満の値を指定した場合のテスト"""
+    with pytest.raises(SystemExit) as exc_info:
+        main(['--jobs', jobs, 'dummy.py'])
+
+    assert exc_info.value.code == 2
+    assert "1以上の整数を指定してください" in capsys.readouterr().err